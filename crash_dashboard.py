@@ -1,5 +1,10 @@
+import operator
+from functools import reduce
+
+import numpy as np
 import streamlit as st
 import pandas as pd
+import polars as pl
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
@@ -7,15 +12,100 @@ from plotly.subplots import make_subplots
 # Page config
 st.set_page_config(page_title="MA Crash Analysis", layout="wide")
 
-# Load data
-@st.cache_data
-def load_data():
-    all_crashes = pd.read_csv('dashboard_data_all_crashes_ts.csv')
-    fatal_serious = pd.read_csv('dashboard_data_fatal_serious_ts.csv')
-    main = pd.read_parquet('dashboard_data_main.parquet')
-    return all_crashes, fatal_serious, main
+# One shared Plotly config; with a stable key per chart, Streamlit patches
+# the existing component in place instead of remounting it every rerun
+PLOTLY_CONFIG = {'staticPlot': False, 'responsive': False}
 
-all_crashes_ts, fatal_serious_ts, main_data = load_data()
+# Load data as lazy scans so filters and aggregations push down into the readers
+@st.cache_resource
+def load_data():
+    # Same narrow widths as the main table (YEAR is stored as float64)
+    ts_casts = [pl.col('YEAR').cast(pl.UInt16), pl.col('crash_count').cast(pl.UInt32)]
+    all_crashes = pl.scan_parquet('dashboard_data_all_crashes_ts.parquet').with_columns(ts_casts)
+    fatal_serious = pl.scan_parquet('dashboard_data_fatal_serious_ts.parquet').with_columns(ts_casts)
+    # Low-cardinality string columns used in every filter and group_by; as
+    # categoricals, compares and grouping run on integer codes, not strings
+    category_columns = [
+        'SEVERITY_GROUP', 'URBAN_TYPE', 'ROAD_SURF_COND_DESCR',
+        'AMBNT_LIGHT_DESCR',
+    ]
+    # Age bands get a declared ordered dtype so sorting on the column yields
+    # band order everywhere, with no per-render re-cast in the age chart
+    age_order = ['<16', '16-17', '18-20', '21-24', '25-34', '35-44',
+                 '45-54', '55-64', '65-74', '75-84', '>84']
+    # Project to the nine columns the dashboard touches; the parquet holds 25
+    # and the reader then never decodes the other sixteen
+    main_columns = category_columns + ['AGE_DRVR_YNGST', 'YEAR', 'HOUR',
+                                       'DAY_OF_WEEK', 'crash_count']
+    main = (
+        pl.scan_parquet('dashboard_data_main.parquet')
+        .select(main_columns)
+        # A few hundred rows have no YEAR; the year-range mask has always
+        # excluded them, so drop them here to keep every path — including
+        # the skipped-filter full-span one — consistent
+        .drop_nulls('YEAR')
+        .with_columns(
+            pl.col(category_columns).cast(pl.Categorical),
+            pl.col('AGE_DRVR_YNGST').cast(pl.Enum(age_order)),
+            # Narrow integer widths: the filter/group_by pipeline is
+            # bandwidth-bound, so smaller columns mean fewer bytes scanned
+            pl.col('YEAR').cast(pl.UInt16),
+            pl.col('HOUR').cast(pl.UInt8),
+            pl.col('DAY_OF_WEEK').cast(pl.UInt8),
+            pl.col('crash_count').cast(pl.UInt32),
+        )
+        # Flag computed once so the Fatal/Serious visuals filter on a plain
+        # boolean column instead of re-running the is_in per query
+        .with_columns(
+            pl.col('SEVERITY_GROUP').is_in(['Fatal', 'Serious']).alias('is_fatal_serious')
+        )
+    )
+    # Sidebar options computed once here rather than on every rerun; the
+    # per-column queries share one parquet pass via collect_all, which runs
+    # them concurrently on the Polars thread pool
+    option_columns = ['URBAN_TYPE', 'ROAD_SURF_COND_DESCR',
+                      'AMBNT_LIGHT_DESCR', 'AGE_DRVR_YNGST']
+    option_queries = [main.select(pl.col(col).drop_nulls().unique())
+                      for col in option_columns]
+    option_queries.append(main.select(
+        pl.col('YEAR').min().alias('min'),
+        pl.col('YEAR').max().alias('max')
+    ))
+    *option_values, year_bounds = pl.collect_all(option_queries)
+    sidebar_options = {
+        col: sorted(values[col].to_list())
+        for col, values in zip(option_columns, option_values)
+    }
+    year_lo, year_hi = year_bounds.row(0)
+    sidebar_options['YEAR'] = (int(year_lo), int(year_hi))
+    return all_crashes, fatal_serious, main, sidebar_options
+
+all_crashes_ts, fatal_serious_ts, main_data, sidebar_options = load_data()
+
+# Small (YEAR, SEVERITY_GROUP, axis) aggregate tables for the visuals. When
+# only the year slider and severity select are active, the visuals slice
+# these few-thousand-row tables instead of re-aggregating millions of rows.
+@st.cache_resource
+def build_cubes(_main):
+    axes = {
+        'SEVERITY': [],
+        'HOUR_DAY': ['HOUR', 'DAY_OF_WEEK'],
+        'HOUR': ['HOUR'],
+        'AMBNT_LIGHT_DESCR': ['AMBNT_LIGHT_DESCR'],
+        'ROAD_SURF_COND_DESCR': ['ROAD_SURF_COND_DESCR'],
+        'AGE_DRVR_YNGST': ['AGE_DRVR_YNGST'],
+    }
+    return {
+        name: (
+            (_main.drop_nulls(cols) if cols else _main)
+            .group_by(['YEAR', 'SEVERITY_GROUP'] + cols)
+            .agg(pl.col('crash_count').sum())
+            .collect()
+        )
+        for name, cols in axes.items()
+    }
+
+cubes = build_cubes(main_data)
 
 # Title
 st.title("Massachusetts Crash Data Analysis (2003-2024)")
@@ -26,8 +116,7 @@ st.markdown("---")
 st.sidebar.header("Filters")
 
 # Year range
-year_min = int(main_data['YEAR'].min())
-year_max = int(main_data['YEAR'].max())
+year_min, year_max = sidebar_options['YEAR']
 year_range = st.sidebar.slider(
     "Year Range",
     min_value=year_min,
@@ -44,62 +133,106 @@ severity_filter = st.sidebar.multiselect(
 )
 
 # Urban type filter
-urban_types = ['All'] + sorted(main_data['URBAN_TYPE'].dropna().unique().tolist())
-urban_filter = st.sidebar.selectbox("Urban Type", urban_types)
+urban_filter = st.sidebar.selectbox("Urban Type", ['All'] + sidebar_options['URBAN_TYPE'])
 
 # Road surface filter
-road_types = ['All'] + sorted(main_data['ROAD_SURF_COND_DESCR'].dropna().unique().tolist())
-road_filter = st.sidebar.selectbox("Road Surface", road_types)
+road_filter = st.sidebar.selectbox("Road Surface", ['All'] + sidebar_options['ROAD_SURF_COND_DESCR'])
 
 # Light condition filter
-light_types = ['All'] + sorted(main_data['AMBNT_LIGHT_DESCR'].dropna().unique().tolist())
-light_filter = st.sidebar.selectbox("Light Condition", light_types)
+light_filter = st.sidebar.selectbox("Light Condition", ['All'] + sidebar_options['AMBNT_LIGHT_DESCR'])
 
 # Age of youngest driver
-age_types = ['All'] + sorted(main_data['AGE_DRVR_YNGST'].dropna().unique().tolist())
-age_filter = st.sidebar.selectbox("Age of Youngest Driver", age_types)
-
-# Apply filters to main data
-filtered_data = main_data[
-    (main_data['YEAR'] >= year_range[0]) & 
-    (main_data['YEAR'] <= year_range[1])
-]
+age_filter = st.sidebar.selectbox("Age of Youngest Driver", ['All'] + sidebar_options['AGE_DRVR_YNGST'])
 
-if 'All' not in severity_filter and len(severity_filter) > 0:
-    filtered_data = filtered_data[filtered_data['SEVERITY_GROUP'].isin(severity_filter)]
+# Build the filter predicates as one combined expression so each visual is a
+# single lazy query and only the surviving rows are ever materialized
+base_preds = [pl.col('YEAR').is_between(year_range[0], year_range[1])]
 
 if urban_filter != 'All':
-    filtered_data = filtered_data[filtered_data['URBAN_TYPE'] == urban_filter]
+    base_preds.append(pl.col('URBAN_TYPE') == urban_filter)
 
 if road_filter != 'All':
-    filtered_data = filtered_data[filtered_data['ROAD_SURF_COND_DESCR'] == road_filter]
+    base_preds.append(pl.col('ROAD_SURF_COND_DESCR') == road_filter)
 
 if light_filter != 'All':
-    filtered_data = filtered_data[filtered_data['AMBNT_LIGHT_DESCR'] == light_filter]
+    base_preds.append(pl.col('AMBNT_LIGHT_DESCR') == light_filter)
+
+# Predicates for the visuals (include severity and age)
+visual_preds = list(base_preds)
+
+if 'All' not in severity_filter and len(severity_filter) > 0:
+    visual_preds.append(pl.col('SEVERITY_GROUP').is_in(severity_filter))
 
 if age_filter != 'All':
-    filtered_data = filtered_data[filtered_data['AGE_DRVR_YNGST'] == age_filter]
+    visual_preds.append(pl.col('AGE_DRVR_YNGST') == age_filter)
+
+base_pred = reduce(operator.and_, base_preds)
+filtered_pred = reduce(operator.and_, visual_preds)
+
+# The cubes only carry YEAR and SEVERITY_GROUP, so they can serve the visuals
+# only while the remaining selectboxes sit at their 'All' defaults
+cube_eligible = (urban_filter == 'All' and road_filter == 'All'
+                 and light_filter == 'All' and age_filter == 'All')
+
+# At the full span — the state the page loads in — the year filter is a no-op
+full_year_span = year_range == (year_min, year_max)
+
+def visual_frame(cube_name, axis_cols, fatal_serious_only=False):
+    """Lazy source for a visual: the matching cube when the active filters
+    allow it, otherwise the fully filtered main data."""
+    if cube_eligible:
+        lf = cubes[cube_name].lazy()
+        if not full_year_span:
+            lf = lf.filter(pl.col('YEAR').is_between(year_range[0], year_range[1]))
+        if 'All' not in severity_filter and len(severity_filter) > 0:
+            lf = lf.filter(pl.col('SEVERITY_GROUP').is_in(severity_filter))
+        if fatal_serious_only:
+            lf = lf.filter(pl.col('SEVERITY_GROUP').is_in(['Fatal', 'Serious']))
+    else:
+        lf = main_data.filter(filtered_pred).drop_nulls(axis_cols)
+        if fatal_serious_only:
+            lf = lf.filter(pl.col('is_fatal_serious'))
+    return lf
+
+# Everything the widgets contribute to a query, so cached query and figure
+# builders key on it
+filter_state = (year_range, tuple(severity_filter), urban_filter,
+                road_filter, light_filter, age_filter)
 
 # Summary stats
 col1, col2, col3, col4 = st.columns(4)
 
-# Get total from ALL data (not filtered by severity)
-total_all_data = main_data[
-    (main_data['YEAR'] >= year_range[0]) & 
-    (main_data['YEAR'] <= year_range[1])
-]
-if urban_filter != 'All':
-    total_all_data = total_all_data[total_all_data['URBAN_TYPE'] == urban_filter]
-    
-if road_filter != 'All':
-    total_all_data = total_all_data[total_all_data['ROAD_SURF_COND_DESCR'] == road_filter]
+# Get totals from ALL data (not filtered by severity) in one aggregation;
+# with no selectbox filter active this reduces the 66-row severity cube
+# instead of the main data (the metrics ignore severity and age by design).
+# Memoized on the widgets it reads, like the figure builders.
+@st.cache_data
+def compute_severity_totals(year_range, urban_filter, road_filter, light_filter):
+    if urban_filter == 'All' and road_filter == 'All' and light_filter == 'All':
+        totals_source = cubes['SEVERITY'].lazy()
+        if not full_year_span:
+            totals_source = totals_source.filter(
+                pl.col('YEAR').is_between(year_range[0], year_range[1])
+            )
+    else:
+        totals_source = main_data.filter(base_pred)
+    return (
+        totals_source
+        .group_by('SEVERITY_GROUP')
+        .agg(pl.col('crash_count').sum())
+        .collect()
+    )
 
-if light_filter != 'All':
-    total_all_data = total_all_data[total_all_data['AMBNT_LIGHT_DESCR'] == light_filter]
+severity_totals = compute_severity_totals(year_range, urban_filter,
+                                          road_filter, light_filter)
 
-total_crashes = total_all_data['crash_count'].sum()
-fatal_crashes = total_all_data[total_all_data['SEVERITY_GROUP'] == 'Fatal']['crash_count'].sum()
-serious_crashes = total_all_data[total_all_data['SEVERITY_GROUP'] == 'Serious']['crash_count'].sum()
+# Three rows at most: pull the counts out as a plain array and index by
+# severity instead of running filter expressions over the tiny frame
+severity_counts = dict(zip(severity_totals['SEVERITY_GROUP'].to_list(),
+                           severity_totals['crash_count'].to_numpy()))
+total_crashes = int(severity_totals['crash_count'].sum() or 0)
+fatal_crashes = int(severity_counts.get('Fatal', 0))
+serious_crashes = int(severity_counts.get('Serious', 0))
 fatal_serious_pct = (fatal_crashes + serious_crashes) / total_crashes * 100 if total_crashes > 0 else 0
 
 col1.metric("Total Crashes", f"{total_crashes:,}")
@@ -112,64 +245,71 @@ st.markdown("---")
 # ========== VISUAL 1: DUAL PANEL TIME SERIES ==========
 st.header("Crash Trends Over Time")
 
-# Filter time series data
-all_crashes_filtered = all_crashes_ts[
-    (all_crashes_ts['YEAR'] >= year_range[0]) & 
-    (all_crashes_ts['YEAR'] <= year_range[1])
-]
-fatal_serious_filtered = fatal_serious_ts[
-    (fatal_serious_ts['YEAR'] >= year_range[0]) & 
-    (fatal_serious_ts['YEAR'] <= year_range[1])
-]
-
-# Create subplot
-fig = make_subplots(
-    rows=2, cols=1,
-    subplot_titles=("All Crashes", "Fatal & Serious Crashes"),
-    vertical_spacing=0.12,
-    row_heights=[0.5, 0.5]
-)
+@st.cache_data
+def build_trends_figure(year_range):
+    # Filter time series data
+    year_pred = (pl.col('YEAR') >= year_range[0]) & (pl.col('YEAR') <= year_range[1])
+    all_crashes_filtered = (
+        all_crashes_ts
+        .filter(year_pred)
+        .sort('YEAR')
+        .collect()
+        .to_pandas(use_pyarrow_extension_array=True)
+    )
+    fatal_serious_filtered = (
+        fatal_serious_ts
+        .filter(year_pred)
+        .sort('YEAR')
+        .collect()
+        .to_pandas(use_pyarrow_extension_array=True)
+    )
 
-# Top panel - all crashes
-fig.add_trace(
-    go.Scatter(
-        x=all_crashes_filtered['YEAR'],
-        y=all_crashes_filtered['crash_count'],
-        mode='lines',
-        line=dict(color='steelblue', width=2),
-        name='All Crashes'
-    ),
-    row=1, col=1
-)
+    # Create subplot
+    fig = make_subplots(
+        rows=2, cols=1,
+        subplot_titles=("All Crashes", "Fatal & Serious Crashes"),
+        vertical_spacing=0.12,
+        row_heights=[0.5, 0.5]
+    )
 
-# Bottom panel - fatal and serious
-for severity in ['Serious', 'Fatal']:
-    data = fatal_serious_filtered[fatal_serious_filtered['SEVERITY_GROUP'] == severity]
-    color = '#ff7f0e' if severity == 'Serious' else '#d62728'
+    # Top panel - all crashes
     fig.add_trace(
         go.Scatter(
-            x=data['YEAR'],
-            y=data['crash_count'],
+            x=all_crashes_filtered['YEAR'],
+            y=all_crashes_filtered['crash_count'],
             mode='lines',
-            fill='tonexty' if severity == 'Fatal' else 'tozeroy',
-            line=dict(color=color, width=2),
-            name=severity,
-            stackgroup='one'
+            line=dict(color='steelblue', width=2),
+            name='All Crashes'
         ),
-        row=2, col=1
+        row=1, col=1
+    )
+
+    # Bottom panel - fatal and serious, stacked; px.area splits the severities
+    # internally instead of masking the frame once per group
+    area = px.area(
+        fatal_serious_filtered,
+        x='YEAR',
+        y='crash_count',
+        color='SEVERITY_GROUP',
+        category_orders={'SEVERITY_GROUP': ['Serious', 'Fatal']},
+        color_discrete_map={'Fatal': '#d62728', 'Serious': '#ff7f0e'}
     )
+    area.update_traces(line_width=2, showlegend=True)
+    fig.add_traces(area.data, rows=2, cols=1)
 
-fig.update_xaxes(title_text="Year", row=2, col=1)
-fig.update_yaxes(title_text="Count", row=1, col=1)
-fig.update_yaxes(title_text="Count", row=2, col=1)
+    fig.update_xaxes(title_text="Year", row=2, col=1)
+    fig.update_yaxes(title_text="Count", row=1, col=1)
+    fig.update_yaxes(title_text="Count", row=2, col=1)
 
-# Force y-axis to start at 0 for both panels
-fig.update_yaxes(rangemode='tozero', row=1, col=1)
-fig.update_yaxes(rangemode='tozero', row=2, col=1)
+    # Force y-axis to start at 0 for both panels
+    fig.update_yaxes(rangemode='tozero', row=1, col=1)
+    fig.update_yaxes(rangemode='tozero', row=2, col=1)
 
-fig.update_layout(height=600, showlegend=True, hovermode='x unified')
+    fig.update_layout(height=600, showlegend=True, hovermode='x unified')
+    return fig
 
-st.plotly_chart(fig, use_container_width=True)
+st.plotly_chart(build_trends_figure(year_range), use_container_width=True,
+                key='trends', config=PLOTLY_CONFIG)
 
 st.markdown("---")
 
@@ -177,143 +317,168 @@ st.markdown("---")
 st.header("Temporal Patterns")
 
 # Create heatmap data: Hour vs Day of Week
-day_order = {0: 'Monday', 1: 'Tuesday', 2: 'Wednesday', 3: 'Thursday', 
-             4: 'Friday', 5: 'Saturday', 6: 'Sunday'}
-
-heatmap_data = filtered_data.groupby(['HOUR', 'DAY_OF_WEEK'])['crash_count'].sum().reset_index()
-heatmap_pivot = heatmap_data.pivot(index='HOUR', columns='DAY_OF_WEEK', values='crash_count').fillna(0)
-
-# Rename columns to day names
-heatmap_pivot.columns = [day_order[col] for col in heatmap_pivot.columns]
-
-fig_heatmap = px.imshow(
-    heatmap_pivot,
-    labels=dict(x="Day of Week", y="Hour of Day", color="Crash Count"),
-    x=heatmap_pivot.columns,
-    y=heatmap_pivot.index,
-    color_continuous_scale='YlOrRd',
-    aspect='auto',
-    title='Crash Frequency by Hour and Day of Week'
-)
-fig_heatmap.update_layout(height=600)
-st.plotly_chart(fig_heatmap, use_container_width=True)
+day_names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday',
+             'Friday', 'Saturday', 'Sunday']
+
+@st.cache_data
+def build_heatmap_figure(filter_state):
+    heatmap_data = (
+        visual_frame('HOUR_DAY', ['HOUR', 'DAY_OF_WEEK'])
+        .group_by(['HOUR', 'DAY_OF_WEEK'])
+        .agg(pl.col('crash_count').sum())
+        .collect()
+    )
+
+    # Scatter the grouped counts straight into the dense 24x7 grid; the
+    # group_by yields unique (hour, day) pairs so plain fancy-index
+    # assignment suffices
+    heatmap_grid = np.zeros((24, 7), dtype=np.int64)
+    heatmap_grid[heatmap_data['HOUR'].to_numpy(), heatmap_data['DAY_OF_WEEK'].to_numpy()] = \
+        heatmap_data['crash_count'].to_numpy()
+    heatmap_pivot = pd.DataFrame(heatmap_grid, index=pd.RangeIndex(24, name='HOUR'), columns=day_names)
+
+    fig_heatmap = px.imshow(
+        heatmap_pivot,
+        labels=dict(x="Day of Week", y="Hour of Day", color="Crash Count"),
+        x=heatmap_pivot.columns,
+        y=heatmap_pivot.index,
+        color_continuous_scale='YlOrRd',
+        aspect='auto',
+        title='Crash Frequency by Hour and Day of Week'
+    )
+    fig_heatmap.update_layout(height=600)
+    return fig_heatmap
+
+st.plotly_chart(build_heatmap_figure(filter_state), use_container_width=True,
+                key='heatmap', config=PLOTLY_CONFIG)
 
 st.markdown("---")
 
 # ========== VISUAL 3: FATAL VS SERIOUS COMPARISON ==========
 st.header("Fatal vs Serious: Pattern Differences")
 
-# Filter to just Fatal and Serious
-fatal_serious_data = filtered_data[filtered_data['SEVERITY_GROUP'].isin(['Fatal', 'Serious'])]
+# Each severity group normalized to percent of its own total, as a window
+# expression evaluated inside the same lazy query as the aggregation
+percentage = (
+    pl.col('crash_count') * 100.0 / pl.col('crash_count').sum().over('SEVERITY_GROUP')
+).alias('percentage')
+
+# The four comparison charts all aggregate crash_count by one category
+# crossed with severity; memoized on the sidebar state so reruns that only
+# touch other widgets reuse the collected frame
+@st.cache_data
+def severity_rates(category, filter_state):
+    return (
+        visual_frame(category, [category], fatal_serious_only=True)
+        .group_by([category, 'SEVERITY_GROUP'])
+        .agg(pl.col('crash_count').sum())
+        .with_columns(percentage)
+        .sort(category)
+        .collect()
+        .to_pandas(use_pyarrow_extension_array=True)
+    )
 
 # Hour distribution comparison - normalized to show relative frequency
-hour_severity = fatal_serious_data.groupby(['HOUR', 'SEVERITY_GROUP'])['crash_count'].sum().reset_index()
-
-# Normalize each severity group to percentage
-for severity in ['Fatal', 'Serious']:
-    mask = hour_severity['SEVERITY_GROUP'] == severity
-    total = hour_severity.loc[mask, 'crash_count'].sum()
-    hour_severity.loc[mask, 'percentage'] = (hour_severity.loc[mask, 'crash_count'] / total) * 100
-
-fig_hour_comp = px.line(
-    hour_severity,
-    x='HOUR',
-    y='percentage',
-    color='SEVERITY_GROUP',
-    title='Fatal vs Serious: Hour of Day Pattern (% of each severity)',
-    labels={'percentage': 'Percentage (%)', 'HOUR': 'Hour', 'SEVERITY_GROUP': 'Severity'},
-    markers=True,
-    color_discrete_map={'Fatal': '#d62728', 'Serious': '#ff7f0e'}
-)
-fig_hour_comp.update_layout(height=500)
-st.plotly_chart(fig_hour_comp, use_container_width=True)
+@st.cache_data
+def build_hour_figure(filter_state):
+    hour_severity = severity_rates('HOUR', filter_state)
+
+    fig_hour_comp = px.line(
+        hour_severity,
+        x='HOUR',
+        y='percentage',
+        color='SEVERITY_GROUP',
+        title='Fatal vs Serious: Hour of Day Pattern (% of each severity)',
+        labels={'percentage': 'Percentage (%)', 'HOUR': 'Hour', 'SEVERITY_GROUP': 'Severity'},
+        markers=True,
+        color_discrete_map={'Fatal': '#d62728', 'Serious': '#ff7f0e'}
+    )
+    fig_hour_comp.update_layout(height=500)
+    return fig_hour_comp
+
+st.plotly_chart(build_hour_figure(filter_state), use_container_width=True,
+                key='hour_comp', config=PLOTLY_CONFIG)
 
 # Light condition comparison - normalized
-light_severity = fatal_serious_data.groupby(['AMBNT_LIGHT_DESCR', 'SEVERITY_GROUP'])['crash_count'].sum().reset_index()
-
-# Normalize each severity group to percentage
-for severity in ['Fatal', 'Serious']:
-    mask = light_severity['SEVERITY_GROUP'] == severity
-    total = light_severity.loc[mask, 'crash_count'].sum()
-    light_severity.loc[mask, 'percentage'] = (light_severity.loc[mask, 'crash_count'] / total) * 100
-
-# Sort by total percentage
-light_severity_sorted = light_severity.groupby('AMBNT_LIGHT_DESCR')['percentage'].sum().reset_index()
-light_severity_sorted = light_severity_sorted.sort_values('percentage', ascending=False).head(10)
-top_conditions = light_severity_sorted['AMBNT_LIGHT_DESCR'].tolist()
-light_severity = light_severity[light_severity['AMBNT_LIGHT_DESCR'].isin(top_conditions)]
-
-fig_light_comp = px.bar(
-    light_severity,
-    x='percentage',
-    y='AMBNT_LIGHT_DESCR',
-    color='SEVERITY_GROUP',
-    orientation='h',
-    title='Fatal vs Serious: Light Conditions (% of each severity)',
-    labels={'percentage': 'Percentage (%)', 'AMBNT_LIGHT_DESCR': 'Light Condition'},
-    color_discrete_map={'Fatal': '#d62728', 'Serious': '#ff7f0e'},
-    barmode='group'
-)
-fig_light_comp.update_layout(height=500, yaxis={'categoryorder': 'total ascending'})
-st.plotly_chart(fig_light_comp, use_container_width=True)
+@st.cache_data
+def build_light_figure(filter_state):
+    light_severity = severity_rates('AMBNT_LIGHT_DESCR', filter_state)
+
+    # Sort by total percentage
+    light_severity_sorted = light_severity.groupby('AMBNT_LIGHT_DESCR', observed=True, sort=False)['percentage'].sum().reset_index()
+    light_severity_sorted = light_severity_sorted.sort_values('percentage', ascending=False).head(10)
+    top_conditions = light_severity_sorted['AMBNT_LIGHT_DESCR'].tolist()
+    light_severity = light_severity[light_severity['AMBNT_LIGHT_DESCR'].isin(top_conditions)]
+
+    fig_light_comp = px.bar(
+        light_severity,
+        x='percentage',
+        y='AMBNT_LIGHT_DESCR',
+        color='SEVERITY_GROUP',
+        orientation='h',
+        title='Fatal vs Serious: Light Conditions (% of each severity)',
+        labels={'percentage': 'Percentage (%)', 'AMBNT_LIGHT_DESCR': 'Light Condition'},
+        color_discrete_map={'Fatal': '#d62728', 'Serious': '#ff7f0e'},
+        barmode='group'
+    )
+    fig_light_comp.update_layout(height=500, yaxis={'categoryorder': 'total ascending'})
+    return fig_light_comp
+
+st.plotly_chart(build_light_figure(filter_state), use_container_width=True,
+                key='light_comp', config=PLOTLY_CONFIG)
 
 # Road surface comparison - normalized
-road_severity = fatal_serious_data.groupby(['ROAD_SURF_COND_DESCR', 'SEVERITY_GROUP'])['crash_count'].sum().reset_index()
-
-# Normalize each severity group to percentage
-for severity in ['Fatal', 'Serious']:
-    mask = road_severity['SEVERITY_GROUP'] == severity
-    total = road_severity.loc[mask, 'crash_count'].sum()
-    road_severity.loc[mask, 'percentage'] = (road_severity.loc[mask, 'crash_count'] / total) * 100
-
-# Sort by total percentage and get top conditions
-road_severity_sorted = road_severity.groupby('ROAD_SURF_COND_DESCR')['percentage'].sum().reset_index()
-road_severity_sorted = road_severity_sorted.sort_values('percentage', ascending=False).head(10)
-top_road_conditions = road_severity_sorted['ROAD_SURF_COND_DESCR'].tolist()
-road_severity = road_severity[road_severity['ROAD_SURF_COND_DESCR'].isin(top_road_conditions)]
-
-fig_road_comp = px.bar(
-    road_severity,
-    x='percentage',
-    y='ROAD_SURF_COND_DESCR',
-    color='SEVERITY_GROUP',
-    orientation='h',
-    title='Fatal vs Serious: Road Surface Conditions (% of each severity)',
-    labels={'percentage': 'Percentage (%)', 'ROAD_SURF_COND_DESCR': 'Road Surface'},
-    color_discrete_map={'Fatal': '#d62728', 'Serious': '#ff7f0e'},
-    barmode='group'
-)
-fig_road_comp.update_layout(height=500, yaxis={'categoryorder': 'total ascending'})
-st.plotly_chart(fig_road_comp, use_container_width=True)
+@st.cache_data
+def build_road_figure(filter_state):
+    road_severity = severity_rates('ROAD_SURF_COND_DESCR', filter_state)
+
+    # Sort by total percentage and get top conditions
+    road_severity_sorted = road_severity.groupby('ROAD_SURF_COND_DESCR', observed=True, sort=False)['percentage'].sum().reset_index()
+    road_severity_sorted = road_severity_sorted.sort_values('percentage', ascending=False).head(10)
+    top_road_conditions = road_severity_sorted['ROAD_SURF_COND_DESCR'].tolist()
+    road_severity = road_severity[road_severity['ROAD_SURF_COND_DESCR'].isin(top_road_conditions)]
+
+    fig_road_comp = px.bar(
+        road_severity,
+        x='percentage',
+        y='ROAD_SURF_COND_DESCR',
+        color='SEVERITY_GROUP',
+        orientation='h',
+        title='Fatal vs Serious: Road Surface Conditions (% of each severity)',
+        labels={'percentage': 'Percentage (%)', 'ROAD_SURF_COND_DESCR': 'Road Surface'},
+        color_discrete_map={'Fatal': '#d62728', 'Serious': '#ff7f0e'},
+        barmode='group'
+    )
+    fig_road_comp.update_layout(height=500, yaxis={'categoryorder': 'total ascending'})
+    return fig_road_comp
+
+st.plotly_chart(build_road_figure(filter_state), use_container_width=True,
+                key='road_comp', config=PLOTLY_CONFIG)
 
 # Age group comparison - normalized
 st.subheader("Age Group Analysis")
 
-age_severity = fatal_serious_data.groupby(['AGE_DRVR_YNGST', 'SEVERITY_GROUP'])['crash_count'].sum().reset_index()
-
-# Normalize each severity group to percentage
-for severity in ['Fatal', 'Serious']:
-    mask = age_severity['SEVERITY_GROUP'] == severity
-    total = age_severity.loc[mask, 'crash_count'].sum()
-    age_severity.loc[mask, 'percentage'] = (age_severity.loc[mask, 'crash_count'] / total) * 100
-
-# Define age order for proper sorting - complete age ranges
-age_order = ['Under 16', '16-17', '18-20', '21-24', '25-34', '35-44', '45-54', '55-64', '65-74', '75-84', '85+', 'Unknown']
-age_severity['AGE_DRVR_YNGST'] = pd.Categorical(age_severity['AGE_DRVR_YNGST'], categories=age_order, ordered=True)
-age_severity = age_severity.sort_values('AGE_DRVR_YNGST')
-
-fig_age_comp = px.bar(
-    age_severity,
-    x='AGE_DRVR_YNGST',
-    y='percentage',
-    color='SEVERITY_GROUP',
-    title='Fatal vs Serious Crashes by Age of Youngest Driver (% of each severity)',
-    labels={'percentage': 'Percentage (%)', 'AGE_DRVR_YNGST': 'Age Group'},
-    color_discrete_map={'Fatal': '#d62728', 'Serious': '#ff7f0e'},
-    barmode='group'
-)
-fig_age_comp.update_layout(height=500, xaxis_tickangle=-45)
-st.plotly_chart(fig_age_comp, use_container_width=True)
+@st.cache_data
+def build_age_figure(filter_state):
+    # Already in age-band order: the column's Enum dtype makes the sort
+    # inside severity_rates come out youngest-to-oldest
+    age_severity = severity_rates('AGE_DRVR_YNGST', filter_state)
+
+    fig_age_comp = px.bar(
+        age_severity,
+        x='AGE_DRVR_YNGST',
+        y='percentage',
+        color='SEVERITY_GROUP',
+        title='Fatal vs Serious Crashes by Age of Youngest Driver (% of each severity)',
+        labels={'percentage': 'Percentage (%)', 'AGE_DRVR_YNGST': 'Age Group'},
+        color_discrete_map={'Fatal': '#d62728', 'Serious': '#ff7f0e'},
+        barmode='group'
+    )
+    fig_age_comp.update_layout(height=500, xaxis_tickangle=-45)
+    return fig_age_comp
+
+st.plotly_chart(build_age_figure(filter_state), use_container_width=True,
+                key='age_comp', config=PLOTLY_CONFIG)
 
 st.markdown("---")
 